@@ -1,12 +1,7 @@
 # -*- encoding: utf-8 -*-
 """Main module for rizza's interface."""
 import argparse
-import pytest
 import sys
-from apix.explore import AsyncExplorer
-from apix.diff import VersionDiff
-from apix.libtools.libmaker import LibMaker
-from apix.helpers import get_api_list, get_ver_list, LooseVersion
 from apix import logger
 
 
@@ -16,22 +11,20 @@ class Main(object):
     def __init__(self):
         # self.conf = Config()
         parser = argparse.ArgumentParser()
-        parser.add_argument(
-            "action",
-            type=str,
-            choices=["explore", "diff", "makelib", "list", "test"],
-            help="The action to perform.",
+        subparsers = parser.add_subparsers(
+            dest="action", required=True, help="The action to perform."
         )
-        args = parser.parse_args(sys.argv[1:2])
-        if not hasattr(self, args.action):
-            logger.warning(f"Action {args.action} is not supported.")
-            parser.print_help()
-            exit(1)
-        getattr(self, args.action)()
+        for action in ("explore", "diff", "makelib", "list", "test"):
+            handler = getattr(self, action)
+            subparser = subparsers.add_parser(action, help=handler.__doc__)
+            getattr(self, f"_{action}_args")(subparser)
+            subparser.set_defaults(func=handler)
+        args = parser.parse_args()
+        args.func(args)
 
-    def explore(self):
-        """Explore a target API and export the findings"""
-        parser = argparse.ArgumentParser()
+    @staticmethod
+    def _explore_args(parser):
+        """Add the arguments for the explore action"""
         parser.add_argument(
             "-n",
             "--api-name",
@@ -79,33 +72,17 @@ class Main(object):
             help="Strip all the extra information from the saved data.",
         )
         parser.add_argument(
-            "--debug", action="store_true", help="Enable debug loggin level."
+            "--yaml",
+            action="store_true",
+            help="Save the results as yaml instead of msgpack.",
         )
-
-        args = parser.parse_args(sys.argv[2:])
-        if args.debug:
-            logger.setup_logzero(level="debug")
-        try:
-            LooseVersion(args.version)
-        except ValueError as err:
-            logger.error(err)
-            sys.exit(1)
-        explorer = AsyncExplorer(
-            name=args.api_name,
-            version=args.version,
-            host_url=args.host_url,
-            base_path=args.base_path,
-            parser=args.parser,
-            data_dir=args.data_dir,
-            compact=args.compact,
+        parser.add_argument(
+            "--debug", action="store_true", help="Enable debug loggin level."
         )
-        explorer.explore()
-        explorer.save_data()
-        sys.exit(0)
 
-    def diff(self):
-        """Determine the changes between two API versions"""
-        parser = argparse.ArgumentParser()
+    @staticmethod
+    def _diff_args(parser):
+        """Add the arguments for the diff action"""
         parser.add_argument(
             "-n",
             "--api-name",
@@ -142,23 +119,9 @@ class Main(object):
             "--debug", action="store_true", help="Enable debug loggin level."
         )
 
-        args = parser.parse_args(sys.argv[2:])
-        if args.debug:
-            logger.setup_logzero(level="debug")
-        vdiff = VersionDiff(
-            api_name=args.api_name,
-            ver1=args.latest_version,
-            ver2=args.previous_version,
-            data_dir=args.data_dir,
-            compact=args.compact,
-        )
-        vdiff.diff()
-        vdiff.save_diff()
-        sys.exit(0)
-
-    def makelib(self):
-        """Create a library to interact with a specific API version"""
-        parser = argparse.ArgumentParser()
+    @staticmethod
+    def _makelib_args(parser):
+        """Add the arguments for the makelib action"""
         parser.add_argument(
             "-n",
             "--api-name",
@@ -190,21 +153,9 @@ class Main(object):
             "--debug", action="store_true", help="Enable debug loggin level."
         )
 
-        args = parser.parse_args(sys.argv[2:])
-        if args.debug:
-            logger.setup_logzero(level="debug")
-        libmaker = LibMaker(
-            api_name=args.api_name,
-            api_version=args.version,
-            template_name=args.template,
-            data_dir=args.data_dir,
-        )
-        libmaker.make_lib()
-        sys.exit(0)
-
-    def list(self):
-        """List out the API information we have stored"""
-        parser = argparse.ArgumentParser()
+    @staticmethod
+    def _list_args(parser):
+        """Add the arguments for the list action"""
         parser.add_argument("subject", type=str, choices=["apis", "versions"])
         parser.add_argument(
             "-n",
@@ -220,7 +171,77 @@ class Main(object):
             help="The base directory in which to search for stored exports.",
         )
 
-        args = parser.parse_args(sys.argv[2:])
+    @staticmethod
+    def _test_args(parser):
+        """Add the arguments for the test action"""
+        parser.add_argument(
+            "--args",
+            type=str,
+            nargs="+",
+            help='pytest args to pass in. (--args="-r a")',
+        )
+
+    def explore(self, args):
+        """Explore a target API and export the findings"""
+        if args.debug:
+            logger.setup_logzero(level="debug")
+        from apix.explore import AsyncExplorer
+        from apix.helpers import LooseVersion
+
+        try:
+            LooseVersion(args.version)
+        except ValueError as err:
+            logger.error(err)
+            sys.exit(1)
+        explorer = AsyncExplorer(
+            name=args.api_name,
+            version=args.version,
+            host_url=args.host_url,
+            base_path=args.base_path,
+            parser=args.parser,
+            data_dir=args.data_dir,
+            compact=args.compact,
+            yaml_export=args.yaml,
+        )
+        explorer.explore()
+        explorer.save_data()
+        sys.exit(0)
+
+    def diff(self, args):
+        """Determine the changes between two API versions"""
+        if args.debug:
+            logger.setup_logzero(level="debug")
+        from apix.diff import VersionDiff
+
+        vdiff = VersionDiff(
+            api_name=args.api_name,
+            ver1=args.latest_version,
+            ver2=args.previous_version,
+            data_dir=args.data_dir,
+            compact=args.compact,
+        )
+        vdiff.diff()
+        vdiff.save_diff()
+        sys.exit(0)
+
+    def makelib(self, args):
+        """Create a library to interact with a specific API version"""
+        if args.debug:
+            logger.setup_logzero(level="debug")
+        from apix.libtools.libmaker import LibMaker
+
+        libmaker = LibMaker(
+            api_name=args.api_name,
+            api_version=args.version,
+            template_name=args.template,
+            data_dir=args.data_dir,
+        )
+        libmaker.make_lib()
+        sys.exit(0)
+
+    def list(self, args):
+        """List out the API information we have stored"""
+        from apix.helpers import get_api_list, get_ver_list
 
         if args.subject == "apis":
             api_list = get_api_list(args.data_dir)
@@ -236,20 +257,14 @@ class Main(object):
                 print(f"Unable to find saved versions in {args.data_dir}")
         sys.exit(0)
 
-    def test(self):
+    def test(self, args):
         """List out some information about our entities and inputs."""
-        parser = argparse.ArgumentParser()
-        parser.add_argument(
-            "--args",
-            type=str,
-            nargs="+",
-            help='pytest args to pass in. (--args="-r a")',
-        )
-        args = parser.parse_args(sys.argv[2:])
         if args.args:
             pyargs = args.args
         else:
             pyargs = ["-q"]
+        import pytest
+
         pytest.cmdline.main(args=pyargs)
         sys.exit(0)
 
@@ -4,7 +4,7 @@ import attr
 import yaml
 from pathlib import Path
 from logzero import logger
-from apix.helpers import get_latest, get_previous, load_api
+from apix.helpers import YamlDumper, get_latest, get_previous, load_api
 
 
 @attr.s()
@@ -157,13 +157,16 @@ class VersionDiff:
             fpath = Path(
                 f"{self.data_dir}APIs/{self.api_name}/{self.ver2}-to-{self.ver1}-{ftype}.yaml"
             )
-        if fpath.exists():
-            fpath.unlink()
         # create the directory, if it doesn't exist
         fpath.parent.mkdir(parents=True, exist_ok=True)
-        fpath.touch()
         logger.info(f"Saving results to {fpath}")
-        with fpath.open("w+") as outfile:
-            yaml.dump(self._vdiff, outfile, default_flow_style=False)
+        with fpath.open("w") as outfile:
+            yaml.dump(
+                self._vdiff,
+                outfile,
+                Dumper=YamlDumper,
+                default_flow_style=False,
+                sort_keys=False,
+            )
         if return_path:
             return fpath
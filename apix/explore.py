@@ -3,15 +3,35 @@
 import aiofiles
 import aiohttp
 import asyncio
-import async_timeout
 import attr
-import requests
+import filecmp
+import msgspec
+import multiprocessing
+import os
+import random
 import time
 import yaml
+from concurrent.futures import ProcessPoolExecutor
 from logzero import logger
 from pathlib import Path
+from apix.helpers import YamlDumper, intern_strings
 from apix.parsers import apipie, test
 
+MSGPACK_ENCODER = msgspec.msgpack.Encoder()
+# bound each connect and read, rather than the whole request, so a slow page
+# that keeps sending data isn't cut off
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_connect=60, sock_read=60)
+# failures that may clear up if the request is made again
+RETRY_ERRORS = (
+    aiohttp.ClientConnectionError,
+    aiohttp.ClientPayloadError,
+    asyncio.TimeoutError,
+)
+# connection failures that no amount of retrying will fix
+FATAL_ERRORS = (aiohttp.ClientSSLError, aiohttp.ClientConnectorDNSError)
+# pages larger than this are scraped in a separate process
+PROCESS_SCRAPE_SIZE = 64 * 1024
+
 
 @attr.s()
 class AsyncExplorer:
@@ -22,8 +42,10 @@ class AsyncExplorer:
     parser = attr.ib(default=None)
     data_dir = attr.ib(default=None)
     compact = attr.ib(default=False)
-    _data = attr.ib(default={}, repr=False)
-    _queue = attr.ib(default=[], repr=False)
+    yaml_export = attr.ib(default=False)
+    max_concurrent = attr.ib(default=16)
+    _data = attr.ib(factory=dict, repr=False)
+    _process_pool = attr.ib(default=None, repr=False)
 
     def __attrs_post_init__(self):
         """perform the more complex steps of class initialization"""
@@ -37,45 +59,80 @@ class AsyncExplorer:
         if not self.parser or isinstance(self.parser, str):
             logger.warning("No known parser specified! Please review documentation.")
 
-    async def _async_get(self, session, link):
-        """visit a page and download the content, returning the link and content"""
-        async with session.get(self.host_url + link[1], ssl=False) as response:
-            content = await response.read()
-            logger.debug(link[1])
-            return (link, content)
-
-    async def _async_loop(self, links):
-        """asynchronously visit each stored link and store results"""
-        tasks = []
-        async with aiohttp.ClientSession() as session:
-            for link in links:
-                task = asyncio.ensure_future(self._async_get(session, link))
-                tasks.append(task)
-            results = await asyncio.gather(*tasks)
-            for result in results:
-                self._queue.append(result)
-
-    def _visit_links(self, links, retries=3):
-        """main controller for asynchronous page visiting, will attempt 3 retries"""
-        try:
-            loop = asyncio.get_event_loop()
-            loop.run_until_complete(self._async_loop(links))
-        except aiohttp.client_exceptions.ServerDisconnectedError as err:
-            logger.warning(
-                "Lost connection to host.{}".join(
-                    "Retrying in 10 seconds" if retries else ""
-                )
+    def _get_process_pool(self):
+        """lazily create the process pool used to scrape large pages"""
+        if self._process_pool is None:
+            # forking while executor threads are mid-parse can deadlock the child
+            methods = multiprocessing.get_all_start_methods()
+            method = "forkserver" if "forkserver" in methods else "spawn"
+            self._process_pool = ProcessPoolExecutor(
+                mp_context=multiprocessing.get_context(method)
             )
-            if retries:
-                time.sleep(10)
-                self._visit_links(links, retries - 1)
-
-    def _link_params(self):
-        """scrape the content downloaded from each page"""
-        while self._queue:
-            link, content = self._queue.pop(0)
+        return self._process_pool
+
+    def close(self):
+        """shut down the process pool, if one has been opened"""
+        if self._process_pool is not None:
+            self._process_pool.shutdown()
+            self._process_pool = None
+
+    @staticmethod
+    def _should_retry(err):
+        """determine whether a failed request is worth making again"""
+        if isinstance(err, aiohttp.ClientResponseError):
+            # asking again won't make a missing page appear
+            return err.status >= 500
+        return isinstance(err, RETRY_ERRORS) and not isinstance(err, FATAL_ERRORS)
+
+    async def _async_get(self, session, path, retries=4):
+        """visit a page and download the content, retrying with backoff on failure"""
+        for attempt in range(retries + 1):
+            try:
+                async with session.get(
+                    self.host_url + path, timeout=REQUEST_TIMEOUT
+                ) as response:
+                    response.raise_for_status()
+                    content = await response.read()
+                    logger.debug(path)
+                    return content
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                if attempt == retries or not self._should_retry(err):
+                    raise
+                backoff = 2 ** attempt + random.random()
+                logger.warning(
+                    f"Unable to reach {path} ({err!r}). "
+                    f"Retrying in {backoff:.1f} seconds"
+                )
+                await asyncio.sleep(backoff)
+
+    async def _async_loop(self, links, session):
+        """asynchronously visit each stored link, scraping and storing results"""
+        loop = asyncio.get_running_loop()
+        # only start a request, and its timeout, once a pooled connection is free
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        async def fetch(link):
+            async with semaphore:
+                content = await self._async_get(session, link[1])
             logger.debug(f"Scraping {link[1]}")
-            self._data[link[1]] = self.parser.scrape_content(content)
+            # scrape in a worker, so parsing overlaps the remaining fetches
+            # large pages go to a separate process to sidestep the GIL
+            executor = None
+            if len(content) > PROCESS_SCRAPE_SIZE:
+                executor = self._get_process_pool()
+            scraped = await loop.run_in_executor(
+                executor, self.parser.scrape_content, content
+            )
+            # paths and parameters repeat heavily across pages, so share one copy
+            # interning happens here, since results from the process pool are copies
+            self._data[link[1]] = intern_strings(scraped)
+
+        results = await asyncio.gather(
+            *(fetch(link) for link in links), return_exceptions=True
+        )
+        for link, result in zip(links, results):
+            if isinstance(result, Exception):
+                logger.error(f"Unable to explore {link[1]}: {result!r}")
 
     def save_data(self, return_path=False):
         """convert the stored data into yaml-friendly dict and save"""
@@ -84,45 +141,100 @@ class AsyncExplorer:
             logger.warning("No data to be saved. Exiting.")
             return
 
+        ext = "yaml" if self.yaml_export else "mp"
         if self.compact:
             from apix.diff import VersionDiff
 
             yaml_data = VersionDiff._truncate(yaml_data)
-            fpath = Path(f"{self.data_dir}APIs/{self.name}/{self.version}-comp.yaml")
+            fpath = Path(f"{self.data_dir}APIs/{self.name}/{self.version}-comp.{ext}")
         else:
-            fpath = Path(f"{self.data_dir}APIs/{self.name}/{self.version}.yaml")
-        if fpath.exists():
-            logger.warning(f"{fpath} already exists. Deleting..")
-            fpath.unlink()
+            fpath = Path(f"{self.data_dir}APIs/{self.name}/{self.version}.{ext}")
         # create the directory, if it doesn't exist
         fpath.parent.mkdir(parents=True, exist_ok=True)
-        fpath.touch()
-        logger.info(f"Saving results to {fpath}")
-        with fpath.open("w+") as outfile:
-            yaml.dump(yaml_data, outfile, default_flow_style=False)
+        # stage the save, so an unchanged file is left alone and a changed one
+        # is replaced atomically
+        tmp_path = fpath.with_name(f"{fpath.name}.tmp")
+        if self.yaml_export:
+            # dump one entity at a time, so only its nodes are held in memory
+            # the concatenated single-key mappings still form one yaml mapping
+            try:
+                with tmp_path.open("w") as outfile:
+                    for entity, entity_data in yaml_data.items():
+                        yaml.dump(
+                            {entity: entity_data},
+                            outfile,
+                            Dumper=YamlDumper,
+                            default_flow_style=False,
+                            sort_keys=False,
+                        )
+            except Exception:
+                # don't leave a partial save behind
+                tmp_path.unlink()
+                raise
+            unchanged = fpath.exists() and filecmp.cmp(fpath, tmp_path, shallow=False)
+        else:
+            content = MSGPACK_ENCODER.encode(yaml_data)
+            unchanged = fpath.exists() and fpath.read_bytes() == content
+            if not unchanged:
+                tmp_path.write_bytes(content)
+        if unchanged:
+            logger.info(f"{fpath} is already up to date.")
+            if tmp_path.exists():
+                tmp_path.unlink()
+        else:
+            if fpath.exists():
+                logger.warning(f"{fpath} already exists. Overwriting..")
+            logger.info(f"Saving results to {fpath}")
+            os.replace(tmp_path, fpath)
+        # drop any save in the other format, since load_api would prefer a stale .mp
+        stale_path = fpath.with_suffix(".mp" if self.yaml_export else ".yaml")
+        if stale_path.exists():
+            logger.warning(f"Removing outdated {stale_path}")
+            stale_path.unlink()
         if return_path:
             return fpath
 
+    async def _get_base_page(self, session):
+        """download the api's base page, returning None if it can't be reached"""
+        try:
+            return await self._async_get(session, self.base_path)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            logger.debug(err)
+            return None
+
+    async def _explore(self):
+        """asynchronous body of explore, sharing one keep-alive session"""
+        # the session is bound to this run's event loop, so it is created here
+        # every page lives on the same host, so the connector's pool size is
+        # what caps the number of requests in flight
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrent, keepalive_timeout=75, ssl=False
+        )
+        try:
+            async with aiohttp.ClientSession(connector=connector) as session:
+                result = await self._get_base_page(session)
+                if not result:
+                    logger.warning(
+                        f"I couldn't find anything useful at "
+                        f"{self.host_url}{self.base_path}."
+                    )
+                    return
+                self.base_path = self.base_path.replace(".html", "")  # for next strep
+                logger.info(f"Starting to explore {self.host_url}{self.base_path}")
+                links = self.parser.pull_links(result, self.base_path)
+                logger.debug(f"Found {len(links)} links!")
+                await self._async_loop(links, session)
+        finally:
+            self.close()
+        # sort the results by link name, to normalize return order
+        self._data = dict(sorted(self._data.items()))
+        return True
+
     def explore(self):
         """main function for the explore module
         visit the initial page, pulling all links from the page
         grab content at link found
-        sort the links to account for incorrect async return order
         scrape the content at each page, per the parser's direction
+        sort the results to account for incorrect async return order
         """
-        result = requests.get(self.host_url + self.base_path, verify=False)
-        if not result:
-            logger.warning(
-                f"I couldn't find anything useful at "
-                f"{self.host_url}{self.base_path}."
-            )
-            return
-        self.base_path = self.base_path.replace(".html", "")  # for next strep
-        logger.info(f"Starting to explore {self.host_url}{self.base_path}")
-        links = self.parser.pull_links(result, self.base_path)
-        logger.debug(f"Found {len(links)} links!")
-        self._visit_links(links)
-        # sort the results by link name, to normalize return order
-        self._queue = sorted(self._queue, key=lambda x: x[0][1])
-        self._link_params()
-        return True
+        return asyncio.run(self._explore())
@@ -1,12 +1,20 @@
 # -*- encoding: utf-8 -*-
 """A collection of miscellaneous helpers that don't quite fit in."""
+import msgspec
 import re
+import sys
 import yaml
 from copy import deepcopy
 from distutils.version import StrictVersion
 from logzero import logger
 from pathlib import Path
 
+MSGPACK_DECODER = msgspec.msgpack.Decoder()
+# use the libyaml bindings when pyyaml was built with them
+YamlDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+SAVE_EXTENSIONS = (".mp", ".yaml")
+
 
 class LooseVersion(StrictVersion):
     """This class adds the characters 's' and '-' to those allowed by StrictVersion"""
@@ -38,13 +46,15 @@ def get_ver_list(api_name, data_dir=None, mock=False):
     if not save_path.exists():
         return None
     # get all versions in directory, that aren't diffs
-    versions = [
-        v_file.name.replace(".yaml", "")
-        for v_file in save_path.iterdir()
-        if "-diff." not in v_file.name
-        and "-comp." not in v_file.name
-        and ".yaml" in v_file.name
-    ] or []
+    versions = list(
+        {
+            v_file.stem
+            for v_file in save_path.iterdir()
+            if "-diff." not in v_file.name
+            and "-comp." not in v_file.name
+            and v_file.suffix in SAVE_EXTENSIONS
+        }
+    )
     try:
         versions.sort(key=LooseVersion, reverse=True)
     except ValueError as err:
@@ -84,14 +94,22 @@ def shift_text(text, shift=1):
 
 
 def load_api(api_name, version, data_dir=None, mock=False):
-    """Load the saved yaml to dict, if the file exists"""
+    """Load the saved msgpack or yaml to dict, if the file exists"""
     if mock:
-        a_path = Path(f"{data_dir}tests/APIs/{api_name}/{version}.yaml")
+        a_path = Path(f"{data_dir}tests/APIs/{api_name}/{version}")
+    else:
+        a_path = Path(f"{data_dir}APIs/{api_name}/{version}")
+    # prefer the msgpack save, falling back to yaml
+    for ext in SAVE_EXTENSIONS:
+        f_path = a_path.with_name(f"{a_path.name}{ext}")
+        if f_path.exists():
+            break
     else:
-        a_path = Path(f"{data_dir}APIs/{api_name}/{version}.yaml")
-    if not a_path.exists():
         return None
-    return yaml.load(a_path.open("r")) or None
+    if ext == ".mp":
+        return MSGPACK_DECODER.decode(f_path.read_bytes()) or None
+    with f_path.open("r") as infile:
+        return yaml.load(infile, Loader=YamlLoader) or None
 
 
 def merge_dicts(dict1, dict2):
@@ -107,3 +125,14 @@ def merge_dicts(dict1, dict2):
     for key in dict2.keys() - dupe_keys:
         merged[key] = deepcopy(dict2[key])
     return merged
+
+
+def intern_strings(data):
+    """Recursively intern the strings held in nested dictionaries and lists"""
+    if isinstance(data, str):
+        return sys.intern(data)
+    if isinstance(data, dict):
+        return {intern_strings(key): intern_strings(val) for key, val in data.items()}
+    if isinstance(data, list):
+        return [intern_strings(item) for item in data]
+    return data
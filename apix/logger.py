@@ -1,7 +1,6 @@
 # -*- encoding: utf-8 -*-
 """Module handling internal and dependency logging."""
 import logging
-import urllib3
 import logzero
 
 
@@ -30,5 +29,4 @@ def setup_logzero(level="info", path="logs/apix.log"):
     )
 
 
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 setup_logzero()
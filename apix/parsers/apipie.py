@@ -8,8 +8,16 @@ Parser classes must currently implement the following methods:
     scrape_content - Returns a dict of params and paths from a single page.
 """
 import attr
+import re
+from collections import defaultdict
+from io import BytesIO
 from logzero import logger
-from lxml import html
+from lxml import etree, html
+
+HTML_PARSER = html.HTMLParser(collect_ids=False, remove_comments=True)
+ANCHORS = etree.XPath("//a[@href]")
+# matches each non-empty line of a table row's text
+ROW_LINES = re.compile(r"[^\n]+")
 
 
 @attr.s()
@@ -18,66 +26,79 @@ class APIPie:
 
     _data = attr.ib(default={}, repr=False)
 
-    def _data_to_yaml(self, index, compact=False):
+    def _data_to_yaml(self, index, entry, compact=False):
         """translate a url and content into paths and parameters"""
         # apidoc/v2/<entity>/<action>.html
-        url = index
-        split_url = url.split("/")
-        action = split_url[-1].replace(".html", "")
+        head, _, action = index.rpartition("/")
+        if action.endswith(".html"):
+            action = action[:-5]
         action = "list" if action == "index" else action
-        try:
-            entity = split_url[-2]
-        except Exception as err:
-            logger.error(err)
+        entity = head.rpartition("/")[2]
+        if not entity:
+            logger.error(f"Unable to determine the entity for {index}")
             return False, False
         if compact:
             return entity, action
-        paths = self._data[index]["paths"]
-        if "/" not in paths[0]:
+        paths = entry["paths"]
+        if not paths or "/" not in paths[0]:
             return False, False
-        params = self._data[index]["params"]
-        return entity, {action: {"paths": paths, "parameters": params}}
+        return entity, {action: {"paths": paths, "parameters": entry["params"]}}
 
     def yaml_format(self, data, compact=False):
         """compile all data into a yaml-compatible dict"""
-        self._data, yaml_data = data, {}
-        for index in self._data:
-            ent, res = self._data_to_yaml(index, compact)
-            if ent and not yaml_data.get(ent, None):
-                yaml_data[ent] = {"methods": [res]}
-            elif ent:
+        self._data, yaml_data = data, defaultdict(lambda: {"methods": []})
+        for index, entry in self._data.items():
+            ent, res = self._data_to_yaml(index, entry, compact)
+            if ent:
                 yaml_data[ent]["methods"].append(res)
-        return yaml_data
+        return dict(yaml_data)
 
     @staticmethod
-    def pull_links(result, base_path):
-        """return all desired links from the target page"""
-        g_links = html.fromstring(result.content).iterlinks()
-        links, last = [], None
-        for link in g_links:
-            url = link[2].replace("../", "")
-            if "/" in url[len(base_path) :] and link[0].text and url != last:
-                links.append((link[0].text, url))
-                last = url
+    def pull_links(content, base_path):
+        """return all desired links from the target page's content"""
+        links, seen = [], set()
+        for anchor in ANCHORS(html.fromstring(content, parser=HTML_PARSER)):
+            url = anchor.get("href").replace("../", "")
+            if anchor.text and "/" in url[len(base_path) :] and url not in seen:
+                links.append((anchor.text, url))
+                seen.add(url)
         return links
 
     @staticmethod
     def scrape_content(content):
         """pull the paths and parameters from the h1 and tables on the page"""
-        tree = html.fromstring(content)
-        paths = tree.xpath("//h1")
-        path_list = []
-        for path in paths:
-            path_list.append(path.text.replace("\n      ", ""))
-        params = tree.xpath("//table/tbody/tr")
-        param_list = []
-        for param in params:
-            temp_list = [
-                x for x in param.text_content().replace("  ", "").split("\n") if x
-            ]
-            param_list.append(temp_list[:2])
-            # If there is a validation, include it in the results
-            if "Validations:" in temp_list:
-                param_list[-1].append(temp_list[temp_list.index("Validations:") + 1])
-            param_list[-1] = " ~ ".join(param_list[-1])
+        path_list, param_list = [], []
+        # stream the page, picking out headers and table body rows as they close
+        # handled elements and their earlier siblings are freed as we go, which
+        # keeps well short of holding the whole parsed page
+        page = etree.iterparse(
+            BytesIO(content),
+            events=("end",),
+            tag=("h1", "tr"),
+            html=True,
+            collect_ids=False,
+            remove_comments=True,
+        )
+        for _, elem in page:
+            # anything inside a row is left intact until its outermost row closes
+            nested = next(elem.iterancestors("tr"), None) is not None
+            if elem.tag == "h1":
+                path_list.append(elem.text.replace("\n      ", ""))
+            elif not nested:
+                # the outermost row and any rows nested in it, in document order
+                for row in elem.iter("tr"):
+                    parent = row.getparent()
+                    if parent.tag != "tbody" or parent.getparent().tag != "table":
+                        continue
+                    text = "".join(row.itertext()).replace("  ", "")
+                    lines = ROW_LINES.findall(text)
+                    fields = lines[:2]
+                    # If there is a validation, include it in the results
+                    if "Validations:" in lines:
+                        fields.append(lines[lines.index("Validations:") + 1])
+                    param_list.append(" ~ ".join(fields))
+            if not nested:
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
         return {"paths": path_list, "params": param_list}
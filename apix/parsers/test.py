@@ -10,8 +10,17 @@ Parser classes must currently implement the following methods:
 https://www.google.com/search?q=apix
 """
 import attr
+import threading
+from collections import defaultdict
 from logzero import logger
-from lxml import html
+from lxml import etree, html
+
+# pull_links runs once on the event loop thread, so it can share a parser
+HTML_PARSER = html.HTMLParser(collect_ids=False, remove_comments=True)
+# scrape_content runs in worker threads, which each need their own parser
+THREAD_PARSERS = threading.local()
+ANCHORS = etree.XPath("//a[@href]")
+TITLE = etree.XPath("//head/title")
 
 
 @attr.s()
@@ -20,48 +29,48 @@ class TestParser:
 
     _data = attr.ib(default={}, repr=False)
 
-    def _data_to_yaml(self, index):
+    def _data_to_yaml(self, index, entry):
         """Translate a url and text into 'paths' and 'parameters'"""
         url = index
         split_url = url.split(".")
         name = split_url[-1]
-        first = self._data[index][0]
-        rest = " ~ ".join(self._data[index][1:])
+        first = entry[0]
+        rest = " ~ ".join(entry[1:])
         return url, {name: {"paths": first, "parameters": rest}}
 
     def yaml_format(self, data):
         """compile all data into a yaml-compatible dict"""
-        self._data, yaml_data = data, {}
-        for index in self._data:
-            ent, res = self._data_to_yaml(index)
-            if ent and not yaml_data.get(ent, None):
-                yaml_data[ent] = {"content": [res]}
-            elif ent:
+        self._data, yaml_data = data, defaultdict(lambda: {"content": []})
+        for index, entry in self._data.items():
+            ent, res = self._data_to_yaml(index, entry)
+            if ent:
                 yaml_data[ent]["content"].append(res)
-        return yaml_data
+        return dict(yaml_data)
 
     @staticmethod
-    def pull_links(result, base_path):
-        """return all desired links from the target page"""
-        g_links = html.fromstring(result.content).iterlinks()
+    def pull_links(content, base_path):
+        """return all desired links from the target page's content"""
         links, last = [], None
-        for link in g_links:
-            url = link[2].replace("../", "")
+        for anchor in ANCHORS(html.fromstring(content, parser=HTML_PARSER)):
+            url = anchor.get("href").replace("../", "")
             if (
                 "JacobCallahan" in url
                 and "sparkline" not in url
-                and link[0].text
+                and anchor.text
                 and url != last
             ):
-                links.append((link[0].text, url))
+                links.append((anchor.text, url))
                 last = url
         return links
 
     @staticmethod
     def scrape_content(content):
         """take the title text from a page, if it exists"""
-        tree = html.fromstring(content)
-        title = tree.xpath("//head/title")
+        if not hasattr(THREAD_PARSERS, "parser"):
+            THREAD_PARSERS.parser = html.HTMLParser(
+                collect_ids=False, remove_comments=True
+            )
+        title = TITLE(html.fromstring(content, parser=THREAD_PARSERS.parser))
         if title:
             title = title[0].text
         else:
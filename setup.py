@@ -11,16 +11,16 @@ with open("HISTORY.rst") as history_file:
 
 requirements = [
     "aiodns",
-    "aiohttp",
+    "aiohttp>=3.11",
     "aiofiles",
     "attrs",
     "black",
     "cchardet",
     "logzero",
     "lxml",
+    "msgspec",
     "pyyaml",
     "pytest",
-    "requests",
 ]
 
 setup(
@@ -44,7 +44,6 @@ setup(
         "License :: OSI Approved :: GNU General Public License v3 (GPLv3)",
         "Natural Language :: English",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.6",
         "Programming Language :: Python :: 3.7",
     ],
 )
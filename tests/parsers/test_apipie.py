@@ -0,0 +1,93 @@
+# -*- encoding: utf-8 -*-
+"""Tests for apix.parsers.apipie."""
+import pytest
+from apix.parsers import apipie
+
+PAGE = b"""<html><head><title>hosts</title></head><body>
+<!-- apidoc page -->
+<h1>
+      GET /api/hosts/:id</h1>
+<h1>
+      GET /api/v2/hosts/:id</h1>
+<table>
+  <thead><tr><th>Param name</th><th>Description</th></tr></thead>
+  <tbody>
+    <tr>
+      <td>
+        <strong>id </strong><br>
+        <small>
+          required
+        </small>
+      </td>
+      <td>
+        <p>The id of the host</p>
+      </td>
+    </tr>
+    <tr>
+      <td>
+        <strong>location_id </strong><br>
+        <small>
+          optional
+        </small>
+      </td>
+      <td>
+        <p>Set the current location context for the request</p>
+
+        <p><strong>Validations:</strong></p>
+        <ul>
+          <li><p>Must be a Integer</p></li>
+        </ul>
+      </td>
+    </tr>
+  </tbody>
+</table>
+</body></html>"""
+
+
+def test_positive_scrape_content():
+    scraped = apipie.APIPie.scrape_content(PAGE)
+    assert scraped["paths"] == ["GET /api/hosts/:id", "GET /api/v2/hosts/:id"]
+    assert scraped["params"] == [
+        "id  ~ required",
+        "location_id  ~ optional ~ Must be a Integer",
+    ]
+
+
+def test_positive_pull_links():
+    index = b"""<html><body>
+    <a href="../apidoc/v2.html">API documentation</a>
+    <a href="../apidoc/v2/hosts.html">Hosts</a>
+    <a href="../apidoc/v2/hosts/index.html">GET /api/hosts</a>
+    <a href="../apidoc/v2/hosts/show.html">GET /api/hosts/:id</a>
+    <a href="../apidoc/v2/hosts/index.html">GET /api/hosts</a>
+    <a href="../apidoc/v2/domains/index.html"><img src="icon.png"/></a>
+    </body></html>"""
+    assert apipie.APIPie.pull_links(index, "apidoc/") == [
+        ("Hosts", "apidoc/v2/hosts.html"),
+        ("GET /api/hosts", "apidoc/v2/hosts/index.html"),
+        ("GET /api/hosts/:id", "apidoc/v2/hosts/show.html"),
+    ]
+
+
+def test_positive_scrape_nested_table():
+    # a description rendered with its own table nests rows inside a row
+    page = b"""<html><body><h1>
+      POST /api/hosts</h1>
+<table><tbody>
+<tr>
+<td>a  b</td>
+<td>x<table><tbody>
+<tr>
+<td>inner</td>
+<td>row</td>
+</tr>
+</tbody></table></td>
+</tr>
+<tr>
+<td>name</td>
+<td>last</td>
+</tr>
+</tbody></table></body></html>"""
+    scraped = apipie.APIPie.scrape_content(page)
+    assert scraped["paths"] == ["POST /api/hosts"]
+    assert scraped["params"] == ["ab ~ x", "inner ~ row", "name ~ last"]
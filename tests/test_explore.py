@@ -1,7 +1,56 @@
 # -*- encoding: utf-8 -*-
 """Tests for apix.explore"""
+import aiohttp
+import asyncio
 import pytest
+import threading
+import yaml
+from aiohttp import web
+from collections import Counter
 from apix import explore
+from apix.helpers import load_api
+
+
+@pytest.fixture
+def local_host():
+    """Serve pages from a background thread, yielding the url, routes and hits
+
+    routes maps a path to a coroutine taking the path's hit count and
+    returning a response; unknown paths are answered with a 404.
+    """
+    routes, hits = {}, Counter()
+
+    async def handler(request):
+        path = request.match_info["path"]
+        hits[path] += 1
+        if path not in routes:
+            return web.Response(status=404)
+        return await routes[path](hits[path])
+
+    app = web.Application()
+    app.router.add_get("/{path:.*}", handler)
+    runner = web.AppRunner(app)
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    loop.run_until_complete(site.start())
+    port = site._server.sockets[0].getsockname()[1]
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{port}/", routes, hits
+    asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+def html_page(body):
+    """Return a coroutine answering every hit with the same html body"""
+
+    async def respond(hit):
+        return web.Response(text=f"<html><body>{body}</body></html>")
+
+    return respond
 
 
 def test_positive_explore():
@@ -18,3 +67,141 @@ def test_positive_explore():
     data_dir = save_file.parent
     save_file.unlink()
     data_dir.rmdir()
+
+
+def test_positive_save_format_switch(tmp_path):
+    data_dir = f"{tmp_path}/"
+    link = "apidoc/v2/hosts/show.html"
+    t_explorer = explore.AsyncExplorer(
+        name="test", version="1.0", parser="apipie", data_dir=data_dir
+    )
+    t_explorer._data = {link: {"paths": ["GET /api/hosts/:id"], "params": []}}
+    mp_file = t_explorer.save_data(return_path=True)
+    assert mp_file.suffix == ".mp"
+    t_explorer.yaml_export = True
+    t_explorer._data = {link: {"paths": ["GET /api/v2/hosts/:id"], "params": []}}
+    yaml_file = t_explorer.save_data(return_path=True)
+    assert yaml_file.exists()
+    assert not mp_file.exists()
+    loaded = load_api("test", "1.0", data_dir)
+    assert loaded["hosts"]["methods"][0]["show"]["paths"] == ["GET /api/v2/hosts/:id"]
+
+
+def test_positive_explore_queued_pages(local_host, monkeypatch):
+    url, routes, hits = local_host
+    links = [f"apidoc/v2/entity{i}/index.html" for i in range(64)]
+    routes["apidoc/"] = html_page(
+        "".join(f'<a href="../{link}">{link}</a>' for link in links)
+    )
+
+    async def slow_page(hit):
+        await asyncio.sleep(0.5)
+        return web.Response(text="<html><body><h1>GET /api/x</h1></body></html>")
+
+    for link in links:
+        routes[link] = slow_page
+    # each response is well inside the timeout, but the whole queue is not
+    monkeypatch.setattr(explore, "REQUEST_TIMEOUT", aiohttp.ClientTimeout(total=1.2))
+    t_explorer = explore.AsyncExplorer(
+        host_url=url, base_path="apidoc/", parser="apipie", max_concurrent=16
+    )
+    assert t_explorer.explore()
+    assert sorted(t_explorer._data) == sorted(links)
+    assert all(hits[link] == 1 for link in links)
+
+
+def get_page(explorer, path, retries):
+    """Fetch a single page through the explorer's retrying _async_get"""
+
+    async def fetch():
+        async with aiohttp.ClientSession() as session:
+            return await explorer._async_get(session, path, retries=retries)
+
+    return asyncio.run(fetch())
+
+
+def test_positive_retry_server_error(local_host):
+    url, routes, hits = local_host
+
+    async def flaky_page(hit):
+        if hit == 1:
+            return web.Response(status=503)
+        return web.Response(text="recovered")
+
+    routes["flaky.html"] = flaky_page
+    t_explorer = explore.AsyncExplorer(host_url=url, parser="test")
+    assert get_page(t_explorer, "flaky.html", retries=1) == b"recovered"
+    assert hits["flaky.html"] == 2
+
+
+def test_negative_retry_gives_up(local_host):
+    url, routes, hits = local_host
+
+    async def broken_page(hit):
+        return web.Response(status=503)
+
+    routes["broken.html"] = broken_page
+    t_explorer = explore.AsyncExplorer(host_url=url, parser="test")
+    with pytest.raises(aiohttp.ClientResponseError):
+        get_page(t_explorer, "broken.html", retries=1)
+    assert hits["broken.html"] == 2
+
+
+def test_negative_retry_missing_page(local_host):
+    url, routes, hits = local_host
+    t_explorer = explore.AsyncExplorer(host_url=url, parser="test")
+    with pytest.raises(aiohttp.ClientResponseError):
+        get_page(t_explorer, "missing.html", retries=4)
+    assert hits["missing.html"] == 1
+
+
+def test_positive_should_retry():
+    should_retry = explore.AsyncExplorer._should_retry
+    assert should_retry(asyncio.TimeoutError())
+    assert should_retry(aiohttp.ServerDisconnectedError())
+    assert not should_retry(aiohttp.InvalidURL("not a url"))
+
+
+@pytest.mark.parametrize("yaml_export", [False, True])
+def test_positive_save_unchanged(tmp_path, yaml_export):
+    link = "apidoc/v2/hosts/show.html"
+    t_explorer = explore.AsyncExplorer(
+        name="test",
+        version="1.0",
+        parser="apipie",
+        data_dir=f"{tmp_path}/",
+        yaml_export=yaml_export,
+    )
+    t_explorer._data = {link: {"paths": ["GET /api/hosts/:id"], "params": []}}
+    save_file = t_explorer.save_data(return_path=True)
+    first = save_file.stat()
+    assert t_explorer.save_data(return_path=True) == save_file
+    second = save_file.stat()
+    assert (second.st_ino, second.st_mtime_ns) == (first.st_ino, first.st_mtime_ns)
+    assert not list(save_file.parent.glob("*.tmp"))
+    t_explorer._data = {link: {"paths": ["GET /api/v2/hosts/:id"], "params": []}}
+    t_explorer.save_data()
+    assert save_file.stat().st_ino != first.st_ino
+    assert not list(save_file.parent.glob("*.tmp"))
+    loaded = load_api("test", "1.0", f"{tmp_path}/")
+    assert loaded["hosts"]["methods"][0]["show"]["paths"] == ["GET /api/v2/hosts/:id"]
+
+
+def test_negative_save_yaml_failure(tmp_path, monkeypatch):
+    t_explorer = explore.AsyncExplorer(
+        name="test",
+        version="1.0",
+        parser="apipie",
+        data_dir=f"{tmp_path}/",
+        yaml_export=True,
+    )
+    link = "apidoc/v2/hosts/show.html"
+    t_explorer._data = {link: {"paths": ["GET /api/hosts/:id"], "params": []}}
+
+    def broken_dump(*args, **kwargs):
+        raise yaml.YAMLError("cannot represent")
+
+    monkeypatch.setattr(explore.yaml, "dump", broken_dump)
+    with pytest.raises(yaml.YAMLError):
+        t_explorer.save_data()
+    assert not list((tmp_path / "APIs" / "test").iterdir())
@@ -1,7 +1,9 @@
 # -*- encoding: utf-8 -*-
 """Tests for apix.helpers."""
 from pathlib import Path
+import msgspec
 import pytest
+import sys
 from apix import helpers
 
 
@@ -54,3 +56,24 @@ def test_negative_load_api():
     assert not helpers.load_api(
         api_name="test123", version="3.9", data_dir="./", mock=True
     )
+
+
+def test_positive_load_api_msgpack(tmp_path):
+    loaded = helpers.load_api(
+        api_name="test123", version="2.1", data_dir="./", mock=True
+    )
+    save_path = tmp_path / "APIs" / "test123" / "2.1.mp"
+    save_path.parent.mkdir(parents=True)
+    save_path.write_bytes(msgspec.msgpack.encode(loaded))
+    assert helpers.get_ver_list(api_name="test123", data_dir=f"{tmp_path}/") == ["2.1"]
+    assert (
+        helpers.load_api(api_name="test123", version="2.1", data_dir=f"{tmp_path}/")
+        == loaded
+    )
+
+
+def test_positive_intern_strings():
+    param = "".join(["location_id", " ~ optional"])
+    interned = helpers.intern_strings({"params": [param], "paths": "GET /api"})
+    assert interned == {"params": [param], "paths": "GET /api"}
+    assert interned["params"][0] is sys.intern("location_id ~ optional")